@@ -1,53 +1,96 @@
 import ezdxf
+from ezdxf.addons import iterdxf
+from ezdxf.document import Drawing
+from ezdxf.filemanagement import dxf_stream_info
+from ezdxf.lldxf.tagger import binary_tags_loader
+from ezdxf.lldxf.validator import is_binary_dxf_file, is_dxf_stream
+import io
 import math
 import sys
+from collections import Counter
+import numpy as np
 
-def analyze_blueprint(file_path):
+# Entity types reported in the analysis
+COUNTED_TYPES = ("LINE", "CIRCLE", "ARC", "LWPOLYLINE", "TEXT", "MTEXT")
+
+# First bytes of every binary DXF file
+BINARY_DXF_SENTINEL = b"AutoCAD Binary DXF\r\n\x1a\x00"
+
+def _dxftypes(entities, line_coords):
+    """
+    Yields the DXF type of each entity, collecting LINE endpoints along the way
+    so counting and bounding box share a single pass over the (streamed) entities.
+    """
+    for e in entities:
+        dxftype = e.dxftype()
+        # Simple bounding box estimation (only for basic entities to avoid complex math deps)
+        if dxftype == "LINE":
+            start, end = e.dxf.start, e.dxf.end
+            line_coords.append((start[0], start[1]))
+            line_coords.append((end[0], end[1]))
+        yield dxftype
+
+def _header_stream(raw):
+    """
+    Lossy text view of an ASCII DXF upload for probing $ACADVER / $DWGCODEPAGE.
+    Decodes lazily, so only the chunks the probe reads are decoded, and
+    normalizes CRLF line endings.
+    """
+    return io.TextIOWrapper(io.BytesIO(raw), encoding='utf-8', errors='ignore', newline=None)
+
+def analyze_blueprint(source):
     """
     Analyzes a DXF file to extract geometric data and estimate complexity.
+    `source` is either a file path or the raw bytes of an uploaded DXF.
     Returns a dictionary of metrics.
     """
+    stream = None
     try:
-        doc = ezdxf.readfile(file_path)
-        msp = doc.modelspace()
-        
-        # Entity counts
-        counts = {
-            "LINE": 0,
-            "CIRCLE": 0, 
-            "ARC": 0,
-            "LWPOLYLINE": 0,
-            "TEXT": 0,
-            "MTEXT": 0
-        }
+        if isinstance(source, (bytes, bytearray)):
+            # Upload is already in memory: parse it directly instead of via a temp file
+            raw = bytes(source)
+            if raw.startswith(BINARY_DXF_SENTINEL):
+                entities = Drawing.load(binary_tags_loader(raw)).modelspace()
+            else:
+                if not is_dxf_stream(_header_stream(raw)):
+                    raise IOError("Uploaded data is not a DXF file.")
+                info = dxf_stream_info(_header_stream(raw))
+                text = io.TextIOWrapper(io.BytesIO(raw), encoding=info.encoding, errors='surrogateescape')
+                entities = ezdxf.read(text).modelspace()
+        else:
+            if is_binary_dxf_file(source):
+                # iterdxf only understands ASCII DXF: load binary DXF as a whole document
+                entities = ezdxf.readfile(source).modelspace()
+            else:
+                # Stream modelspace entities instead of loading the whole document tree
+                stream = iterdxf.opendxf(source)
+                entities = stream.modelspace()
         
-        # Bounding Box tracking
-        min_x, min_y = float('inf'), float('inf')
-        max_x, max_y = float('-inf'), float('-inf')
+        # Bounding Box tracking: LINE endpoints, reduced once after the loop
+        line_coords = []
         
-        entity_count = 0
+        try:
+            # Counter tallies types in C; the generator feeds it and records LINE coords
+            types = Counter(_dxftypes(entities, line_coords))
+        finally:
+            if stream is not None:
+                stream.close()
         
-        for e in msp:
-            dxftype = e.dxftype()
-            if dxftype in counts:
-                counts[dxftype] += 1
-            entity_count += 1
-            
-            # Simple bounding box estimation (only for basic entities to avoid complex math deps)
-            if dxftype == "LINE":
-                min_x = min(min_x, e.dxf.start[0], e.dxf.end[0])
-                max_x = max(max_x, e.dxf.start[0], e.dxf.end[0])
-                min_y = min(min_y, e.dxf.start[1], e.dxf.end[1])
-                max_y = max(max_y, e.dxf.start[1], e.dxf.end[1])
+        # Entity counts
+        counts = {k: types.get(k, 0) for k in COUNTED_TYPES}
+        entity_count = sum(types.values())
         
         # Calculate Dimensions
         width = 0
         height = 0
         area = 0
         
-        if min_x != float('inf'):
-            width = max_x - min_x
-            height = max_y - min_y
+        if line_coords:
+            coords = np.array(line_coords, dtype=np.float64)
+            min_x, min_y = coords.min(axis=0)
+            max_x, max_y = coords.max(axis=0)
+            width = float(max_x - min_x)
+            height = float(max_y - min_y)
             area = width * height
             
         # Complexity Score (Heuristic)
@@ -1,15 +1,25 @@
 from fastapi import FastAPI, UploadFile, File, HTTPException
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-import pandas as pd
+from fastapi.middleware.gzip import GZipMiddleware
 import numpy as np
-import joblib
-import shutil
+import pyarrow.parquet as pq
+import lightgbm as lgb
 import os
-from math import radians, cos, sin, asin, sqrt
+import threading
+from functools import lru_cache
+from math import radians
+from sklearn.neighbors import BallTree
+
+try:
+    from numba import njit
+except ImportError:
+    # Numba is optional: without it the scoring kernel runs as plain Python
+    def njit(*args, **kwargs):
+        return lambda fn: fn
 
 # Import local modules
-from models import UserInput, EnrichedProjectInput, ImpactResult, MLPrediction, BlueprintResult
+from models import UserInput, EnrichedProject, CityContext, ImpactResult, MLPrediction, LocationResult, BlueprintResult
 
 from fastapi.responses import FileResponse
 
@@ -26,20 +36,40 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress JSON/HTML responses (tiny payloads aren't worth the CPU)
+app.add_middleware(GZipMiddleware, minimum_size=512, compresslevel=5)
+
 
 # Load Resources
 try:
-    ML_MODEL = joblib.load('impact_model.pkl')
-    SENSITIVE_LOCS = pd.read_csv('data/sensitive_locations.csv')
-    CITIES_DB = pd.read_csv('data/cities_aqi.csv')
-    # Normalize city names for easier lookup
-    CITIES_DB['city_lower'] = CITIES_DB['city'].str.lower()
+    ML_MODEL = lgb.Booster(model_file='impact_model.txt')
+    # Small static reference tables: typed Parquet read straight into Arrow, no DataFrame needed at runtime
+    CITIES_DB = pq.read_table('data/cities_aqi.parquet')
+    SENSITIVE_LOCS = pq.read_table('data/sensitive_locations.parquet')
+    # Index by normalized city name for O(1) lookup
+    CITY_INDEX = {row['city'].lower().strip(): row for row in CITIES_DB.to_pylist()}
+    # Sensitive zones as column arrays (structure of arrays), converted once:
+    # contiguous float64 coords and object arrays holding plain Python str
+    SENS_LAT = np.ascontiguousarray(SENSITIVE_LOCS.column('lat').to_numpy(), dtype=np.float64)
+    SENS_LNG = np.ascontiguousarray(SENSITIVE_LOCS.column('lng').to_numpy(), dtype=np.float64)
+    SENS_NAME = np.asarray(SENSITIVE_LOCS.column('name').to_pylist(), dtype=object)
+    SENS_CAT = np.asarray(SENSITIVE_LOCS.column('category').to_pylist(), dtype=object)
+    # Sensitive zones never change at runtime: index them once for O(log N) proximity queries
+    SENS_TREE = BallTree(np.radians(np.column_stack((SENS_LAT, SENS_LNG))), metric='haversine')
     print("Resources loaded successfully.")
 except Exception as e:
     print(f"Warning: Resources not loaded: {e}")
     ML_MODEL = None
     SENSITIVE_LOCS = None
     CITIES_DB = None
+    CITY_INDEX = None
+    SENS_LAT = SENS_LNG = SENS_NAME = SENS_CAT = None
+    SENS_TREE = None
+
+# Reusable single-row feature vector for ML inference (guarded: sync endpoints run in a threadpool)
+# float32 matches the training matrix (see ml_train.py)
+FEATURE_BUF = np.empty((1, 16), dtype=np.float32)
+FEATURE_LOCK = threading.Lock()
 
 @app.get("/api/health")
 def health_check():
@@ -50,57 +80,79 @@ async def read_root():
     return FileResponse('index.html')
 
 # --- UTILS ---
-def haversine(lon1, lat1, lon2, lat2):
+EARTH_RADIUS_KM = 6371
+
+def nearest_sensitive(lat, lng):
     """
-    Calculate the great circle distance in km between two points 
-    on the earth (specified in decimal degrees)
+    Nearest sensitive location to a point (decimal degrees).
+    Returns (index into the SENS_* arrays, great circle distance in km).
     """
-    lon1, lat1, lon2, lat2 = map(radians, [lon1, lat1, lon2, lat2])
-    dlon = lon2 - lon1 
-    dlat = lat2 - lat1 
-    a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-    c = 2 * asin(sqrt(a)) 
-    r = 6371 # Radius of earth in kilometers
-    return c * r
-
-def enrich_data(user_input: UserInput) -> EnrichedProjectInput:
+    dist, idx = SENS_TREE.query([[radians(lat), radians(lng)]], k=1)
+    return int(idx[0, 0]), float(dist[0, 0]) * EARTH_RADIUS_KM
+
+# City centres are fixed too: resolve each one's nearest sensitive zone once at startup,
+# so known cities need no trig or tree query per request
+CITY_NEAREST = None
+if CITY_INDEX is not None and SENS_TREE is not None:
+    CITY_NEAREST = {
+        key: nearest_sensitive(rec['latitude'], rec['longitude']) for key, rec in CITY_INDEX.items()
+    }
+
+# Default fallback (Median of dataset approx)
+CITY_DEFAULTS = {
+    "pm25": 100.0, "no2": 40.0, "so2": 15.0, "co": 1.5, "o3": 30.0, 
+    "lat": 20.5937, "lng": 78.9629, "noise": 55.0
+}
+
+@lru_cache(maxsize=2048)
+def _city_context(city_key: str, project_type: str) -> CityContext:
     """
-    Transforms simple user input into full technical input by looking up city data.
+    City/type-derived part of the enrichment. Depends only on reference data,
+    so it is cached per (city, project_type); the key is built from plain strings
+    because UserInput itself is mutable and unhashable.
     """
-    # Default fallback (Median of dataset approx)
-    defaults = {
-        "pm25": 100.0, "no2": 40.0, "so2": 15.0, "co": 1.5, "o3": 30.0, 
-        "lat": 20.5937, "lng": 78.9629, "noise": 55.0
-    }
-    
-    city_key = user_input.city.lower().strip()
     city_data = None
     
-    if CITIES_DB is not None:
-        match = CITIES_DB[CITIES_DB['city_lower'] == city_key]
-        if not match.empty:
-            city_data = match.iloc[0]
+    if CITY_INDEX is not None:
+        city_data = CITY_INDEX.get(city_key)
             
     # Enrich
-    lat = city_data['latitude'] if city_data is not None else defaults['lat']
-    lng = city_data['longitude'] if city_data is not None else defaults['lng']
+    lat = city_data['latitude'] if city_data is not None else CITY_DEFAULTS['lat']
+    lng = city_data['longitude'] if city_data is not None else CITY_DEFAULTS['lng']
 
     # Proximity Check (Simplified: Check if City Center is near any Sensitive Zone)
     # Ideally we'd need exact project location, but for MVP city center is the proxy.
     near_sensitive = 0
-    if SENSITIVE_LOCS is not None:
-        for _, row in SENSITIVE_LOCS.iterrows():
-            dist = haversine(lng, lat, row['lng'], row['lat'])
-            if dist < 5.0: # 5km Buffer
-                near_sensitive = 1
-                break
+    if SENS_TREE is not None:
+        if city_data is not None:
+            _, dist_km = CITY_NEAREST[city_key]
+        else:
+            _, dist_km = nearest_sensitive(lat, lng)
+        if dist_km < 5.0: # 5km Buffer
+            near_sensitive = 1
                 
     # Noise Estimation based on Type
     base_noise = 50.0
-    if user_input.project_type == "Industrial": base_noise = 75.0
-    elif user_input.project_type == "Commercial": base_noise = 65.0
+    if project_type == "Industrial": base_noise = 75.0
+    elif project_type == "Commercial": base_noise = 65.0
     
-    return EnrichedProjectInput(
+    return CityContext(
+        near_sensitive_zone=near_sensitive,
+        avg_noise_db=base_noise,
+        baseline_pm25=float(city_data['pm25']) if city_data is not None else CITY_DEFAULTS['pm25'],
+        baseline_no2=float(city_data['no2']) if city_data is not None else CITY_DEFAULTS['no2'],
+        baseline_so2=float(city_data['so2']) if city_data is not None else CITY_DEFAULTS['so2'],
+        baseline_co=float(city_data['co_mg_m3']) if city_data is not None else CITY_DEFAULTS['co'],
+        baseline_o3=float(city_data['o3']) if city_data is not None else CITY_DEFAULTS['o3'],
+    )
+
+def enrich_data(user_input: UserInput) -> EnrichedProject:
+    """
+    Transforms simple user input into full technical input by looking up city data.
+    """
+    ctx = _city_context(user_input.city.lower().strip(), user_input.project_type)
+    
+    return EnrichedProject(
         land_area_m2=user_input.land_area_m2,
         built_up_area_m2=user_input.built_up_area_m2,
         floors=user_input.floors,
@@ -111,15 +163,15 @@ def enrich_data(user_input: UserInput) -> EnrichedProjectInput:
         fuel_consumption_l_per_day=user_input.fuel_consumption_l_per_day,
         distance_to_residential_m=user_input.distance_to_residential_m,
         vegetation_removed_percent=user_input.vegetation_removed_percent,
-        avg_noise_db=base_noise,
-        near_sensitive_zone=near_sensitive,
+        avg_noise_db=ctx.avg_noise_db,
+        near_sensitive_zone=ctx.near_sensitive_zone,
         
         # Environmental Baseline
-        baseline_pm25=float(city_data['pm25']) if city_data is not None else defaults['pm25'],
-        baseline_no2=float(city_data['no2']) if city_data is not None else defaults['no2'],
-        baseline_so2=float(city_data['so2']) if city_data is not None else defaults['so2'],
-        baseline_co=float(city_data['co_mg_m3']) if city_data is not None else defaults['co'],
-        baseline_o3=float(city_data['o3']) if city_data is not None else defaults['o3'],
+        baseline_pm25=ctx.baseline_pm25,
+        baseline_no2=ctx.baseline_no2,
+        baseline_so2=ctx.baseline_so2,
+        baseline_co=ctx.baseline_co,
+        baseline_o3=ctx.baseline_o3,
         
         # Passthrough / Calc Props
         dg_hours_per_day=user_input.dg_hours_per_day,
@@ -132,6 +184,85 @@ def enrich_data(user_input: UserInput) -> EnrichedProjectInput:
         energy_efficient_lighting=user_input.energy_efficient_lighting
     )
 
+def _physics(data: EnrichedProject):
+    """
+    Simplified physics engine shared by the rule engine and the ML features.
+    Returns (added_pm25, added_no2, final_pm25, final_no2, final_so2, final_co).
+    """
+    # Added Pollution
+    added_pm25 = ((data.vehicles_per_day * 0.5) + (data.fuel_consumption_l_per_day * 2)) / 1000 # kg/day approx scaled
+    added_no2 = ((data.vehicles_per_day * 0.2) + (data.fuel_consumption_l_per_day * 20)) / 1000
+    
+    # Final Concentrations (Box Model coeff = 50 for local)
+    final_pm25 = data.baseline_pm25 + (added_pm25 * 50)
+    final_no2 = data.baseline_no2 + (added_no2 * 50)
+    
+    # Fill remaining physics variables with defaults for ML stability if needed, simplified here:
+    final_so2 = data.baseline_so2
+    final_co = data.baseline_co
+    
+    return added_pm25, added_no2, final_pm25, final_no2, final_so2, final_co
+
+@njit("UniTuple(f8, 6)(" + ", ".join(["f8"] * 16) + ")", cache=True)
+def _score(final_pm25, final_no2, dg_hours_per_day,
+           built_up_area_m2, daily_water_m3, distance_to_water_body_km,
+           stp_present, has_rainwater_harvesting,
+           daily_waste_kg, hazardous_waste_kg_per_month, waste_segregation,
+           vegetation_removed_percent, near_sensitive_zone, green_area_percent,
+           avg_noise_db, distance_to_residential_m):
+    """
+    Rule-based impact scoring on plain floats (compiled by Numba when available,
+    eagerly via the explicit signature so requests never pay JIT cost).
+    Returns (overall, air, water, land, waste, noise) scores.
+    """
+    # Lower is Better for Environment, but we want Score out of 100
+    # Let's verify scoring: "Impact Score". High Impact = High Score.
+    # User Requirement: <=30 Low, 60+ High. So 0 is Good, 100 is Bad.
+    
+    # Air Score (0-100)
+    # AQI > 300 is bad. 
+    air_score = (final_pm25 / 250 * 50) + (final_no2 / 100 * 30) + (dg_hours_per_day * 2)
+    air_score = min(100.0, air_score)
+    
+    # Water Score
+    # 135 LPCD is standard.
+    # Total liters = daily_water_m3 * 1000
+    # Persons approx = rooms * 2
+    # Fix: 'rooms' is not in EnrichedInput, let's derive approx occupancy from water or area
+    # 10 sq m per person?
+    persons = max(1.0, built_up_area_m2 / 15) 
+    lpcd = (daily_water_m3 * 1000) / persons
+    
+    water_score = 0.0
+    if lpcd > 150: water_score += 40
+    if distance_to_water_body_km < 0.5: water_score += 40
+    if stp_present == 0: water_score += 20
+    if has_rainwater_harvesting == 1: water_score -= 10
+    water_score = max(0.0, min(100.0, water_score))
+    
+    # Waste Score
+    waste_score = (daily_waste_kg / 100 * 10) + (hazardous_waste_kg_per_month * 2)
+    if waste_segregation == 0: waste_score += 20
+    waste_score = min(100.0, waste_score)
+    
+    # Land/Bio Score
+    land_score = vegetation_removed_percent
+    if near_sensitive_zone == 1: land_score += 40
+    if green_area_percent < 10: land_score += 20
+    land_score = min(100.0, land_score)
+    
+    # Noise Score
+    noise_score = avg_noise_db - 45 # Baseline silence
+    noise_score = max(0.0, noise_score * 2)
+    if distance_to_residential_m < 50: noise_score += 20
+    noise_score = min(100.0, noise_score)
+    
+    # Overall Score (Weighted)
+    # Weights: Air 30%, Water 25%, Land 20%, Waste 15%, Noise 10%
+    overall_score = (air_score * 0.3) + (water_score * 0.25) + (land_score * 0.2) + (waste_score * 0.15) + (noise_score * 0.10)
+    
+    return overall_score, air_score, water_score, land_score, waste_score, noise_score
+
 # --- ENDPOINTS ---
 
 @app.post("/analyze-blueprint", response_model=BlueprintResult)
@@ -160,22 +291,12 @@ async def upload_blueprint(file: UploadFile = File(...)):
             "message": "Only .DXF files are supported for Blueprint Analysis in this version."
         }
     
-    # Use system temp directory to avoid triggering reloads (Uvicorn/LiveServer)
-    import tempfile
-    
-    # Create a temp file with .dxf suffix so ezdxf can read it if extension matters (though usually reads content)
-    # delete=False because we need to close it before ezdxf re-opens it on Windows
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".dxf") as tmp:
-        shutil.copyfileobj(file.file, tmp)
-        temp_path = tmp.name
-        
+    # Parse the upload in memory (no temp file round-trip)
+    raw = await file.read()
     try:
-        result = analyze_blueprint(temp_path)
-        os.remove(temp_path) # Cleanup
+        result = analyze_blueprint(raw)
         return {"success": result['success'], "data": result, "message": result.get('message', 'Analyzed')}
     except Exception as e:
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
         return {"success": False, "data": None, "message": f"Analysis failed: {str(e)}"}
 
 @app.post("/calculate-impact", response_model=ImpactResult)
@@ -185,62 +306,17 @@ def calculate_impact(user_data: UserInput):
         data = enrich_data(user_data)
         
         # 1. Physics Engine (Simplified)
-        # Added Pollution
-        added_pm25 = ((data.vehicles_per_day * 0.5) + (data.fuel_consumption_l_per_day * 2)) / 1000 # kg/day approx scaled
-        added_no2 = ((data.vehicles_per_day * 0.2) + (data.fuel_consumption_l_per_day * 20)) / 1000
-        
-        # Construction Dust
-        construction_dust = data.built_up_area_m2 * 0.0001 * (1 + (data.vegetation_removed_percent/100))
-        
-        # Final Concentrations (Box Model coeff = 50 for local)
-        final_pm25 = data.baseline_pm25 + (added_pm25 * 50)
-        final_no2 = data.baseline_no2 + (added_no2 * 50)
-        
-        # 2. Rule-Based Scoring (Lower is Better for Environment, but we want Score out of 100)
-        # Let's verify scoring: "Impact Score". High Impact = High Score.
-        # User Requirement: <=30 Low, 60+ High. So 0 is Good, 100 is Bad.
-        
-        # Air Score (0-100)
-        # AQI > 300 is bad. 
-        air_score = (final_pm25 / 250 * 50) + (final_no2 / 100 * 30) + (data.dg_hours_per_day * 2)
-        air_score = min(100, air_score)
-        
-        # Water Score
-        # 135 LPCD is standard.
-        # Total liters = data.daily_water_m3 * 1000
-        # Persons approx = rooms * 2
-        # Fix: 'rooms' is not in EnrichedInput, let's derive approx occupancy from water or area
-        # 10 sq m per person?
-        persons = max(1, data.built_up_area_m2 / 15) 
-        lpcd = (data.daily_water_m3 * 1000) / persons
-        
-        water_score = 0
-        if lpcd > 150: water_score += 40
-        if data.distance_to_water_body_km < 0.5: water_score += 40
-        if data.stp_present == 0: water_score += 20
-        if data.has_rainwater_harvesting == 1: water_score -= 10
-        water_score = max(0, min(100, water_score))
+        added_pm25, added_no2, final_pm25, final_no2, _, _ = _physics(data)
         
-        # Waste Score
-        waste_score = (data.daily_waste_kg / 100 * 10) + (data.hazardous_waste_kg_per_month * 2)
-        if data.waste_segregation == 0: waste_score += 20
-        waste_score = min(100, waste_score)
-        
-        # Land/Bio Score
-        land_score = (data.vegetation_removed_percent) 
-        if data.near_sensitive_zone == 1: land_score += 40
-        if data.green_area_percent < 10: land_score += 20
-        land_score = min(100, land_score)
-        
-        # Noise Score
-        noise_score = data.avg_noise_db - 45 # Baseline silence
-        noise_score = max(0, noise_score * 2)
-        if data.distance_to_residential_m < 50: noise_score += 20
-        noise_score = min(100, noise_score)
-        
-        # Overall Score (Weighted)
-        # Weights: Air 30%, Water 25%, Land 20%, Waste 15%, Noise 10%
-        overall_score = (air_score * 0.3) + (water_score * 0.25) + (land_score * 0.2) + (waste_score * 0.15) + (noise_score * 0.10)
+        # 2. Rule-Based Scoring
+        overall_score, air_score, water_score, land_score, waste_score, noise_score = _score(
+            final_pm25, final_no2, data.dg_hours_per_day,
+            data.built_up_area_m2, data.daily_water_m3, data.distance_to_water_body_km,
+            data.stp_present, data.has_rainwater_harvesting,
+            data.daily_waste_kg, data.hazardous_waste_kg_per_month, data.waste_segregation,
+            data.vegetation_removed_percent, data.near_sensitive_zone, data.green_area_percent,
+            data.avg_noise_db, data.distance_to_residential_m
+        )
         
         # Recommendations
         recs = []
@@ -288,17 +364,8 @@ def predict_impact_ml(user_data: UserInput):
         # Lookup
         data = enrich_data(user_data)
         
-        # Feature Engineering (Same as ml_train logic)
-         # Added Pollution (Replicated logic)
-        added_pm25 = ((data.vehicles_per_day * 0.5) + (data.fuel_consumption_l_per_day * 2)) / 1000 
-        added_no2 = ((data.vehicles_per_day * 0.2) + (data.fuel_consumption_l_per_day * 20)) / 1000
-        construction_dust = data.built_up_area_m2 * 0.0001 * (1 + (data.vegetation_removed_percent/100))
-        final_pm25 = data.baseline_pm25 + (added_pm25 * 50)
-        final_no2 = data.baseline_no2 + (added_no2 * 50)
-        
-        # Fill remaining physics variables with defaults for ML stability if needed, simplified here:
-        final_so2 = data.baseline_so2 
-        final_co = data.baseline_co
+        # Feature Engineering (Same physics as the rule engine)
+        _, _, final_pm25, final_no2, final_so2, final_co = _physics(data)
         
         # Feature Vector
         # Must match training order:
@@ -308,17 +375,18 @@ def predict_impact_ml(user_data: UserInput):
         # 'near_sensitive_zone', 'vehicles_per_day', 'fuel_consumption_l_per_day',
         # 'final_pm25', 'final_no2', 'final_so2', 'final_co'
         
-        features = [[
-            data.land_area_m2, data.built_up_area_m2, data.floors, data.daily_water_m3,
-            data.daily_waste_kg, data.hazardous_waste_kg_per_month, data.avg_noise_db,
-            data.distance_to_residential_m, data.vegetation_removed_percent,
-            data.near_sensitive_zone, data.vehicles_per_day, data.fuel_consumption_l_per_day,
-            final_pm25, final_no2, final_so2, final_co
-        ]]
-        
-        pred_class = ML_MODEL.predict(features)[0]
-        probs = ML_MODEL.predict_proba(features)[0]
-        confidence = max(probs)
+        with FEATURE_LOCK:
+            FEATURE_BUF[0] = (
+                data.land_area_m2, data.built_up_area_m2, data.floors, data.daily_water_m3,
+                data.daily_waste_kg, data.hazardous_waste_kg_per_month, data.avg_noise_db,
+                data.distance_to_residential_m, data.vegetation_removed_percent,
+                data.near_sensitive_zone, data.vehicles_per_day, data.fuel_consumption_l_per_day,
+                final_pm25, final_no2, final_so2, final_co
+            )
+            # Multiclass booster returns class probabilities; labels are 0..2
+            probs = ML_MODEL.predict(FEATURE_BUF, num_threads=1)[0]
+        pred_class = probs.argmax()
+        confidence = probs[pred_class]
         
         labels = {0: "Low", 1: "Moderate", 2: "High"}
         
@@ -333,39 +401,29 @@ def predict_impact_ml(user_data: UserInput):
         print(f"Error in predict_impact_ml: {str(e)}")
         raise HTTPException(status_code=500, detail=f"ML prediction failed: {str(e)}")
 
-@app.get("/analyze-location")
+@app.get("/analyze-location", response_model=LocationResult, response_model_exclude_none=True)
 def analyze_location_proximity(city: str):
     try:
         # Just return City Center info + Nearest sensitive zone to city center
-        if CITIES_DB is None: 
+        if CITY_INDEX is None: 
             return {"nearest_location": "Unknown", "distance_km": 0, "risk": "Unknown"}
         
-        match = CITIES_DB[CITIES_DB['city_lower'] == city.lower()]
-        if match.empty:
+        city_key = city.lower().strip()
+        if city_key not in CITY_INDEX:
              return {"nearest_location": "City Not Found", "distance_km": 0, "risk": "Unknown"}
-             
-        city_data = match.iloc[0]
-        lat, lng = city_data['latitude'], city_data['longitude']
         
-        if SENSITIVE_LOCS is None:
+        if CITY_NEAREST is None:
               return {"nearest_location": "Unknown", "distance_km": 0, "risk": "Unknown"}
         
-        min_dist = float('inf')
-        nearest = None
-        
-        for idx, row in SENSITIVE_LOCS.iterrows():
-            dist = haversine(lng, lat, row['lng'], row['lat'])
-            if dist < min_dist:
-                min_dist = dist
-                nearest = row
+        idx, min_dist = CITY_NEAREST[city_key]
                 
         risk = "Low"
         if min_dist < 2.0: risk = "High"
         elif min_dist < 10.0: risk = "Moderate" # Larger buffer for city-level
         
         return {
-            "nearest_location": nearest['name'],
-            "type": nearest['category'],
+            "nearest_location": SENS_NAME[idx],
+            "type": SENS_CAT[idx],
             "distance_km": round(min_dist, 2),
             "risk": risk
         }
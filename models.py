@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+from dataclasses import dataclass
 from typing import Optional, Dict
 
 class UserInput(BaseModel):
@@ -35,8 +36,10 @@ class UserInput(BaseModel):
     waste_segregation: int = 0
     stp_present: int = 0
     
-class EnrichedProjectInput(BaseModel):
-    # Inherits everything from UserInput logic basically, but flat structure is easier for ML
+@dataclass(slots=True)
+class EnrichedProject:
+    # Internal, already-validated input for the scoring/ML code (built from UserInput,
+    # so no pydantic overhead): slots keep the many field reads per request cheap
     
     # Copy of UserInput
     land_area_m2: float
@@ -68,15 +71,17 @@ class EnrichedProjectInput(BaseModel):
     green_area_percent: int
     has_solar: int
     energy_efficient_lighting: int
-    
-    # Additional fields needed for logic
-    built_up_area_m2: float # Already there but good to be explicit
-    rooms: int = 1 # Added fallback as it was used in calculation but missing here
-    has_rainwater_harvesting: int = 0
-    has_solar: int = 0
-    energy_efficient_lighting: int = 0
-    waste_segregation: int = 0
-    stp_present: int = 0
+
+@dataclass(frozen=True)
+class CityContext:
+    # City/type-derived part of EnrichedProject (cached, so immutable)
+    near_sensitive_zone: int
+    avg_noise_db: float
+    baseline_pm25: float
+    baseline_no2: float
+    baseline_so2: float
+    baseline_co: float
+    baseline_o3: float
 
 class ImpactResult(BaseModel):
     overall_score: float
@@ -92,6 +97,12 @@ class MLPrediction(BaseModel):
     label: str
     confidence: float
 
+class LocationResult(BaseModel):
+    nearest_location: str
+    type: Optional[str] = None # Category, only when a sensitive zone was found
+    distance_km: float
+    risk: str
+
 class BlueprintResult(BaseModel):
     success: bool
     data: Optional[Dict]
@@ -1,122 +1,111 @@
 import pandas as pd
 import numpy as np
-import random
+from joblib import Parallel, delayed
+
+# Rows per worker task. Fixed (not tied to core count) so a given n and seed
+# always produce the same dataset regardless of the machine it runs on.
+CHUNK_SIZE = 250_000
+
+def _gen_chunk(seed, n):
+    """Generates n synthetic samples from an independent random stream."""
+    rng = np.random.default_rng(seed)
 
-def generate_synthetic_data(n=5000):
-    # Seed for reproducibility
-    np.random.seed(42)
-    
-    data = []
-    
-    cities = ['Delhi', 'Mumbai', 'Bengaluru', 'Chennai', 'Hyderabad', 
-              'Kolkata', 'Pune', 'Ahmedabad', 'Noida', 'Gurugram']
-    
     types = ['Residential', 'Commercial', 'Industrial']
-    
-    for _ in range(n):
-        # 1. Random Inputs within realistic ranges
-        city = random.choice(cities)
-        p_type = random.choice(types)
-        
-        # Base multipliers
-        size_mult = 1.0
-        if p_type == 'Commercial': size_mult = 1.5
-        if p_type == 'Industrial': size_mult = 2.0
-        
-        land_area = int(np.random.normal(5000 * size_mult, 2000))
-        land_area = max(500, land_area)
-        
-        built_up = int(land_area * np.random.uniform(1.5, 4.0)) # FSI
-        
-        floors = max(1, int(built_up / land_area * 1.2))
-        
-        # Resource consumption
-        water = built_up * 0.005 * np.random.uniform(0.8, 1.2)
-        waste = built_up * 0.002 * np.random.uniform(0.8, 1.2)
-        haz_waste = 0
-        if p_type == 'Industrial':
-            haz_waste = waste * 0.1 * np.random.uniform(0.5, 2.0)
-            
-        # Traffic
-        vehicles = int(built_up * 0.05 * np.random.uniform(0.5, 1.5))
-        fuel = vehicles * 0.5
-        
-        # Context
-        dist_res = np.random.randint(50, 1000)
-        veg_removed = np.random.uniform(0, 100)
-        sensitive = 1 if np.random.random() < 0.1 else 0
-        
-        # --- CALCULATE "TRUE" IMPACT SCORE (The Target) ---
-        # We use a formula similar to our backend rule engine to label the data
-        # so the ML model learns to mimic this logic perfectly.
-        
-        score = 0
-        
-        # 1. Resource Intensity
-        if water > 1000: score += 15
-        elif water > 100: score += 10
-        else: score += 5
-        
-        if waste > 500: score += 15
-        elif waste > 50: score += 10
-        else: score += 5
-        
-        if haz_waste > 50: score += 20 # Penalize Industrial
-        
-        # 2. Traffic
-        if vehicles > 500: score += 15
-        
-        # 3. Location Sensitivity
-        if sensitive: score += 25
-        if dist_res < 100: score += 10
-        if veg_removed > 50: score += 10
-        
-        # 4. Add Random Noise to Score (to make it realistic/harder)
-        noise = np.random.randint(-5, 5)
-        final_score = max(0, min(100, score + noise))
-        
-        # 5. Determine Class Labels
-        # Low < 40, Moderate 40-70, High > 70
-        if final_score < 40:
-            impact_class = 0 # Low
-            label = 'Low'
-        elif final_score < 70:
-            impact_class = 1 # Moderate
-            label = 'Moderate'
-        else:
-            impact_class = 2 # High
-            label = 'High'
-            
-        # 6. Final Outputs (mocking the "final_pollution" derived features)
-        # In a real pipeline, these would be calculated. Here we simulate them correlated to input.
-        pm25 = 50 + (vehicles * 0.1) + (waste * 0.05)
-        no2 = 20 + (vehicles * 0.05)
-        
-        row = {
-            'land_area_m2': land_area,
-            'built_up_area_m2': built_up,
-            'floors': floors,
-            'daily_water_m3': water,
-            'daily_waste_kg': waste,
-            'hazardous_waste_kg_per_month': haz_waste,
-            'avg_noise_db': np.random.uniform(40, 90),
-            'distance_to_residential_m': dist_res,
-            'vegetation_removed_percent': veg_removed,
-            'near_sensitive_zone': sensitive,
-            'vehicles_per_day': vehicles,
-            'fuel_consumption_l_per_day': fuel,
-            'final_pm25': pm25,
-            'final_no2': no2,
-            'final_so2': pm25 * 0.1,
-            'final_co': pm25 * 0.01,
-            'impact_class_numeric': impact_class,
-            'impact_label': label 
-        }
-        data.append(row)
-        
-    df = pd.DataFrame(data)
-    df.to_csv('data/synthetic_eia_data.csv', index=False)
-    print(f"Generated {n} synthetic samples to data/synthetic_eia_data.csv")
+
+    # All samples are drawn at once as N-sized arrays (one element per project)
+
+    # 1. Random Inputs within realistic ranges
+    p_type = rng.integers(0, len(types), n)
+    is_industrial = p_type == 2
+
+    # Base multipliers (Residential 1.0, Commercial 1.5, Industrial 2.0)
+    size_mult = np.choose(p_type, [1.0, 1.5, 2.0])
+
+    land_area = np.maximum(500, rng.normal(5000 * size_mult, 2000).astype(int))
+
+    built_up = (land_area * rng.uniform(1.5, 4.0, n)).astype(int) # FSI
+
+    floors = np.maximum(1, (built_up / land_area * 1.2).astype(int))
+
+    # Resource consumption
+    water = built_up * 0.005 * rng.uniform(0.8, 1.2, n)
+    waste = built_up * 0.002 * rng.uniform(0.8, 1.2, n)
+    haz_waste = np.where(is_industrial, waste * 0.1 * rng.uniform(0.5, 2.0, n), 0.0)
+
+    # Traffic
+    vehicles = (built_up * 0.05 * rng.uniform(0.5, 1.5, n)).astype(int)
+    fuel = vehicles * 0.5
+
+    # Context
+    dist_res = rng.integers(50, 1000, n)
+    veg_removed = rng.uniform(0, 100, n)
+    sensitive = (rng.random(n) < 0.1).astype(int)
+
+    # --- CALCULATE "TRUE" IMPACT SCORE (The Target) ---
+    # We use a formula similar to our backend rule engine to label the data
+    # so the ML model learns to mimic this logic perfectly.
+
+    # 1. Resource Intensity
+    score = np.where(water > 1000, 15, np.where(water > 100, 10, 5))
+    score += np.where(waste > 500, 15, np.where(waste > 50, 10, 5))
+    score += np.where(haz_waste > 50, 20, 0) # Penalize Industrial
+
+    # 2. Traffic
+    score += np.where(vehicles > 500, 15, 0)
+
+    # 3. Location Sensitivity
+    score += np.where(sensitive == 1, 25, 0)
+    score += np.where(dist_res < 100, 10, 0)
+    score += np.where(veg_removed > 50, 10, 0)
+
+    # 4. Add Random Noise to Score (to make it realistic/harder)
+    noise = rng.integers(-5, 5, n)
+    final_score = np.clip(score + noise, 0, 100)
+
+    # 5. Determine Class Labels
+    # Low < 40, Moderate 40-70, High > 70
+    impact_class = np.where(final_score < 40, 0, np.where(final_score < 70, 1, 2))
+    label = np.array(['Low', 'Moderate', 'High'])[impact_class]
+
+    # 6. Final Outputs (mocking the "final_pollution" derived features)
+    # In a real pipeline, these would be calculated. Here we simulate them correlated to input.
+    pm25 = 50 + (vehicles * 0.1) + (waste * 0.05)
+    no2 = 20 + (vehicles * 0.05)
+
+    return pd.DataFrame({
+        'land_area_m2': land_area,
+        'built_up_area_m2': built_up,
+        'floors': floors,
+        'daily_water_m3': water,
+        'daily_waste_kg': waste,
+        'hazardous_waste_kg_per_month': haz_waste,
+        'avg_noise_db': rng.uniform(40, 90, n),
+        'distance_to_residential_m': dist_res,
+        'vegetation_removed_percent': veg_removed,
+        'near_sensitive_zone': sensitive,
+        'vehicles_per_day': vehicles,
+        'fuel_consumption_l_per_day': fuel,
+        'final_pm25': pm25,
+        'final_no2': no2,
+        'final_so2': pm25 * 0.1,
+        'final_co': pm25 * 0.01,
+        'impact_class_numeric': impact_class,
+        'impact_label': label
+    })
+
+def generate_synthetic_data(n=5000):
+    # Seed for reproducibility: one child stream per chunk
+    # (n=0 still gets one empty chunk so an empty dataset with the full schema is written)
+    sizes = [CHUNK_SIZE] * (n // CHUNK_SIZE) + ([n % CHUNK_SIZE] if n % CHUNK_SIZE else []) or [0]
+    seeds = np.random.SeedSequence(42).spawn(len(sizes))
+
+    # Shard large datasets across all cores; a single chunk just runs in-process
+    chunks = Parallel(n_jobs=-1 if len(sizes) > 1 else 1)(
+        delayed(_gen_chunk)(seed, m) for seed, m in zip(seeds, sizes)
+    )
+    df = pd.concat(chunks, ignore_index=True)
+    df.to_parquet('data/synthetic_eia_data.parquet', index=False)
+    print(f"Generated {n} synthetic samples to data/synthetic_eia_data.parquet")
 
 if __name__ == "__main__":
     generate_synthetic_data()
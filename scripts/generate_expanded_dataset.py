@@ -4,7 +4,7 @@ import numpy as np
 def run_data_expansion():
     # Load Datasets
     projects = pd.read_csv('data/sample_projects.csv')
-    cities = pd.read_csv('data/cities_aqi.csv')
+    cities = pd.read_parquet('data/cities_aqi.parquet')
 
     # Merge AQI baseline data
     expanded = pd.merge(projects, cities, on="city", how="left")
@@ -0,0 +1,78 @@
+import os
+import sys
+
+import ezdxf
+import pytest
+from fastapi.testclient import TestClient
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module")
+def client():
+    # main.py loads its model/data with paths relative to the repo root
+    cwd = os.getcwd()
+    os.chdir(ROOT)
+    sys.path.insert(0, ROOT)
+    try:
+        import main
+        yield TestClient(main.app)
+    finally:
+        os.chdir(cwd)
+
+
+def _drawing_with_lines(n):
+    doc = ezdxf.new()
+    msp = doc.modelspace()
+    for i in range(n):
+        msp.add_line((0, i), (5, i + 1))
+    return doc
+
+
+def _save(doc, path, fmt):
+    if fmt == "bin":
+        doc.saveas(path, fmt="bin")
+    elif fmt == "asc-crlf":
+        # Line endings as written by AutoCAD on Windows
+        doc.saveas(path)
+        path.write_bytes(path.read_bytes().replace(b"\r\n", b"\n").replace(b"\n", b"\r\n"))
+    else:
+        doc.saveas(path)
+
+
+@pytest.mark.parametrize("fmt", ["asc", "asc-crlf", "bin"])
+def test_analyze_blueprint_upload(client, tmp_path, fmt):
+    path = tmp_path / f"plan_{fmt}.dxf"
+    _save(_drawing_with_lines(10), path, fmt)
+
+    with open(path, "rb") as fh:
+        res = client.post("/analyze-blueprint", files={"file": ("plan.dxf", fh)})
+
+    body = res.json()
+    assert body["success"] is True
+    assert body["data"]["entity_counts"]["LINE"] == 10
+    assert body["data"]["estimated_width_m"] == 5.0
+    assert body["data"]["estimated_height_m"] == 10.0
+
+
+def test_analyze_blueprint_upload_declared_encoding(client, tmp_path):
+    # Pre-R2007 files are written in the $DWGCODEPAGE encoding, not UTF-8
+    doc = _drawing_with_lines(3)
+    doc.dxfversion = "R2000"
+    doc.modelspace().add_text("café")
+    path = tmp_path / "plan_cp1252.dxf"
+    doc.saveas(path, encoding="cp1252")
+    raw = path.read_bytes()
+    assert "café".encode("cp1252") in raw
+
+    from blueprint_utils import _header_stream
+    from ezdxf.filemanagement import dxf_stream_info
+    assert dxf_stream_info(_header_stream(raw)).encoding == "cp1252"
+
+    with open(path, "rb") as fh:
+        res = client.post("/analyze-blueprint", files={"file": ("plan.dxf", fh)})
+
+    body = res.json()
+    assert body["success"] is True
+    assert body["data"]["entity_counts"]["LINE"] == 3
+    assert body["data"]["entity_counts"]["TEXT"] == 1